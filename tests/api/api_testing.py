@@ -1,11 +1,8 @@
-import time
-import hmac
-import hashlib
-import base64
 import requests
-import json
 import os
 
+from weex_sign import build_headers, json_dumps, sign, timestamp_ms
+
 # Try to load .env file if python-dotenv is available
 try:
     from dotenv import load_dotenv
@@ -39,33 +36,23 @@ if not api_key or not secret_key or not access_passphrase:
 
 
 def generate_signature(secret_key, timestamp, method, request_path, query_string, body):
-  message = timestamp + method.upper() + request_path + query_string + str(body)
-  signature = hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).digest()
-  # print(base64.b64encode(signature).decode())
-  return base64.b64encode(signature).decode()
+  # body is the already-encoded JSON bytes; method is passed uppercase by callers
+  return sign(secret_key.encode(), timestamp, method, request_path, query_string, body)
 
 
 def generate_signature_get(secret_key, timestamp, method, request_path, query_string):
-  message = timestamp + method.upper() + request_path + query_string
-  signature = hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).digest()
-  # print(base64.b64encode(signature).decode())
-  return base64.b64encode(signature).decode()
+  return sign(secret_key.encode(), timestamp, method, request_path, query_string)
 
 
 def send_request_post(api_key, secret_key, access_passphrase, method, request_path, query_string, body):
-  timestamp = str(int(time.time() * 1000))
+  timestamp = timestamp_ms()
   # print(timestamp)
-  body = json.dumps(body)
+  body = json_dumps(body)
   signature = generate_signature(secret_key, timestamp, method, request_path, query_string, body)
 
-  headers = {
-        "ACCESS-KEY": api_key,
-        "ACCESS-SIGN": signature,
-        "ACCESS-TIMESTAMP": timestamp,
-        "ACCESS-PASSPHRASE": access_passphrase,
-        "Content-Type": "application/json",
-        "locale": "en-US"
-  }
+  headers = build_headers(api_key, access_passphrase, signature, timestamp)
+  headers["Content-Type"] = "application/json"
+  headers["locale"] = "en-US"
 
   url = "https://api-contract.weex.com"  # WEEX Contract API base URL
   if method == "GET":
@@ -75,18 +62,13 @@ def send_request_post(api_key, secret_key, access_passphrase, method, request_pa
   return response
 
 def send_request_get(api_key, secret_key, access_passphrase, method, request_path, query_string):
-  timestamp = str(int(time.time() * 1000))
+  timestamp = timestamp_ms()
   # print(timestamp)
   signature = generate_signature_get(secret_key, timestamp, method, request_path, query_string)
 
-  headers = {
-        "ACCESS-KEY": api_key,
-        "ACCESS-SIGN": signature,
-        "ACCESS-TIMESTAMP": timestamp,
-        "ACCESS-PASSPHRASE": access_passphrase,
-        "Content-Type": "application/json",
-        "locale": "en-US"
-  }
+  headers = build_headers(api_key, access_passphrase, signature, timestamp)
+  headers["Content-Type"] = "application/json"
+  headers["locale"] = "en-US"
 
   url = "https://api-contract.weex.com"  # WEEX Contract API base URL
   if method == "GET":
@@ -8,20 +8,23 @@ WEEX 账户批量检查工具
 使用方法:
     python3 check_accounts.py --api-keys api_keys.csv --proxy http://proxy.example.com:3128
     python3 check_accounts.py --api-keys api_keys.json --min-volume 10
+    python3 check_accounts.py --api-keys api_keys.csv --workers 16 --rate 10
 """
 
-import time
-import hmac
-import hashlib
-import base64
 import requests
 import json
 import os
 import sys
 import argparse
-import csv
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+from weex_sign import Signer, build_headers, json_dumps, json_loads, timestamp_ms
+from weex_utils import RateLimiter, load_api_keys
 
 # Try to load .env file if python-dotenv is available
 try:
@@ -32,6 +35,8 @@ except ImportError:
 
 BASE_URL = "https://api-contract.weex.com"
 SYMBOL = "cmt_btcusdt"  # 默认检查的交易对
+REQUEST_TIMEOUT = 30  # 单个请求超时（秒）
+RATE_LIMIT_RETRIES = 3  # 被限流（HTTP 429）时的最大重试次数
 
 
 def mask_proxy_url(proxy_url: str) -> str:
@@ -49,14 +54,56 @@ def mask_proxy_url(proxy_url: str) -> str:
     return proxy_url
 
 
+def create_session(proxy: Optional[str] = None, pool_size: int = 32) -> requests.Session:
+    """创建 HTTP 会话
+    
+    所有检查器共享同一个会话时，连接池内的 TCP/TLS 连接可以跨账户复用，
+    不必为每个账户重新握手。pool_size 应不小于并发线程数。
+    """
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    session.headers.update({
+        "Content-Type": "application/json",
+        "locale": "zh-CN"
+    })
+    if proxy:
+        session.proxies = {
+            'http': proxy,
+            'https': proxy,
+        }
+    return session
+
+
+def iter_fill_values(trades: List[Dict]):
+    """逐条产出成交记录的 fillValue（成交金额，单位：USDT）
+    
+    缺少 fillValue 或无法转换为数字的记录会被跳过。
+    """
+    for trade in trades:
+        if 'fillValue' in trade:
+            try:
+                yield float(trade['fillValue'])
+            except (ValueError, TypeError):
+                continue
+
+
 class WEEXAccountChecker:
     """WEEX 账户检查器"""
     
-    def __init__(self, api_key: str, secret_key: str, passphrase: str, proxy: Optional[str] = None):
+    def __init__(self, api_key: str, secret_key: str, passphrase: str, proxy: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, timeout: float = REQUEST_TIMEOUT,
+                 session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.secret_key = secret_key
         self.passphrase = passphrase
-        self.session = requests.Session()
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        
+        # secret_key 在检查器生命周期内不变，签名器预先计算好 HMAC 密钥状态
+        self._signer = Signer(secret_key)
+        
+        # 多个检查器可共享同一个会话（连接池），只有认证头按账户区分
+        self.session = session if session is not None else create_session(proxy)
         
         # 配置代理
         if proxy:
@@ -64,31 +111,25 @@ class WEEXAccountChecker:
                 'http': proxy,
                 'https': proxy,
             }
-            self.session.proxies = self.proxies
         else:
             self.proxies = None
     
-    def generate_signature(self, timestamp: str, method: str, request_path: str, query_string: str, body: str = "") -> str:
-        """生成 API 签名"""
-        message = timestamp + method.upper() + request_path + query_string + str(body)
-        signature = hmac.new(self.secret_key.encode(), message.encode(), hashlib.sha256).digest()
-        return base64.b64encode(signature).decode()
+    def generate_signature_get(self, timestamp: str, request_path: str, query_string: str) -> str:
+        """生成 GET 请求签名（没有请求体，不拼接 body）"""
+        return self._signer.sign(timestamp, "GET", request_path, query_string)
+    
+    def generate_signature_post(self, timestamp: str, request_path: str, query_string: str, body: bytes) -> str:
+        """生成 POST 请求签名（body 为已编码的 JSON 字节串）"""
+        return self._signer.sign(timestamp, "POST", request_path, query_string, body)
     
     def send_request(self, method: str, request_path: str, query_string: str = "", body: Optional[Dict] = None) -> requests.Response:
-        """发送 API 请求"""
-        timestamp = str(int(time.time() * 1000))
-        body_str = json.dumps(body) if body else ""
-        
-        signature = self.generate_signature(timestamp, method, request_path, query_string, body_str)
-        
-        headers = {
-            "ACCESS-KEY": self.api_key,
-            "ACCESS-SIGN": signature,
-            "ACCESS-TIMESTAMP": timestamp,
-            "ACCESS-PASSPHRASE": self.passphrase,
-            "Content-Type": "application/json",
-            "locale": "zh-CN"
-        }
+        """发送 API 请求（配置了限速器时，遇到 HTTP 429 会等待后重新签名重试）"""
+        if method == "GET":
+            body_bytes = None
+        elif method == "POST":
+            body_bytes = json_dumps(body) if body else b""
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
         url = BASE_URL + request_path
         if query_string:
@@ -97,19 +138,35 @@ class WEEXAccountChecker:
             else:
                 url += "?" + query_string
         
-        if method == "GET":
-            response = self.session.get(url, headers=headers, proxies=self.proxies, timeout=120)
-        elif method == "POST":
-            response = self.session.post(url, headers=headers, data=body_str, proxies=self.proxies, timeout=120)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+        for _ in range(RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            
+            # 每次尝试都重新生成时间戳和签名，限流等待之后旧的时间戳可能已过期
+            timestamp = timestamp_ms()
+            if method == "GET":
+                signature = self.generate_signature_get(timestamp, request_path, query_string)
+            else:
+                signature = self.generate_signature_post(timestamp, request_path, query_string, body_bytes)
+            
+            headers = build_headers(self.api_key, self.passphrase, signature, timestamp)
+            
+            if method == "GET":
+                response = self.session.get(url, headers=headers, proxies=self.proxies, timeout=self.timeout)
+            else:
+                response = self.session.post(url, headers=headers, data=body_bytes, proxies=self.proxies, timeout=self.timeout)
+            
+            if self.rate_limiter is None:
+                break
+            self.rate_limiter.observe(response)
+            if response.status_code != 429:
+                break
         
         return response
     
     def check_balance(self) -> Dict:
         """检查账户余额"""
         request_path = "/capi/v2/account/assets"
-        response = self.send_request("GET", request_path)
         
         result = {
             'success': False,
@@ -118,17 +175,24 @@ class WEEXAccountChecker:
             'error': None
         }
         
+        # 超时、连接失败等只记为该账户的错误，不中断其他账户的检查
+        try:
+            response = self.send_request("GET", request_path)
+        except requests.RequestException as e:
+            result['error'] = f"请求失败: {str(e)}"
+            return result
+        
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = json_loads(response.content)
                 if isinstance(data, list):
                     result['success'] = True
                     result['balance'] = data
-                    # 查找 USDT 余额
-                    for asset in data:
-                        if asset.get('coinName', '').upper() == 'USDT':
-                            result['usdt_balance'] = float(asset.get('available', 0))
-                            break
+                    # 查找 USDT 余额（按币种名建一次索引，重复币种以第一条为准）
+                    by_coin = {asset.get('coinName', '').upper(): asset for asset in reversed(data)}
+                    usdt = by_coin.get('USDT')
+                    if usdt is not None:
+                        result['usdt_balance'] = float(usdt.get('available', 0))
             except Exception as e:
                 result['error'] = f"解析响应失败: {str(e)}"
         else:
@@ -162,7 +226,7 @@ class WEEXAccountChecker:
             response = self.send_request("GET", request_path, query_string=query_string)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 
                 # 处理响应数据
                 # 实际 API 返回格式：
@@ -192,16 +256,7 @@ class WEEXAccountChecker:
                     trades = data['data'] if isinstance(data['data'], list) else []
                 
                 # 计算总交易量（使用 fillValue 字段，单位：USDT）
-                total_volume = 0.0
-                for trade in trades:
-                    # 使用 fillValue 字段（成交金额，单位：USDT）
-                    if 'fillValue' in trade:
-                        try:
-                            fill_value = float(trade.get('fillValue', 0))
-                            total_volume += fill_value
-                        except (ValueError, TypeError):
-                            # 如果 fillValue 无法转换为数字，跳过这条记录
-                            continue
+                total_volume = math.fsum(iter_fill_values(trades))
                 
                 result['success'] = True
                 result['total_volume'] = total_volume
@@ -226,51 +281,38 @@ class WEEXAccountChecker:
         return result
 
 
-def load_api_keys_from_json(file_path: str) -> List[Dict[str, str]]:
-    """从 JSON 文件加载 API keys"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def check_account(creds: Dict[str, str], args: argparse.Namespace, rate_limiter: Optional[RateLimiter] = None,
+                  session: Optional[requests.Session] = None) -> Dict:
+    """检查单个账户（在线程池中执行）"""
+    checker = WEEXAccountChecker(
+        api_key=creds['api_key'],
+        secret_key=creds['secret_key'],
+        passphrase=creds['passphrase'],
+        proxy=args.proxy,
+        rate_limiter=rate_limiter,
+        timeout=args.timeout,
+        session=session
+    )
     
-    if isinstance(data, list):
-        return data
-    elif isinstance(data, dict) and 'api_keys' in data:
-        return data['api_keys']
-    else:
-        raise ValueError("JSON 文件格式错误，应该是数组或包含 'api_keys' 字段的对象")
-
-
-def load_api_keys_from_csv(file_path: str) -> List[Dict[str, str]]:
-    """从 CSV 文件加载 API keys"""
-    api_keys = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row_num, row in enumerate(reader, start=2):
-            api_key = row.get('api_key') or row.get('WEEX_API_KEY') or row.get('apiKey')
-            secret_key = row.get('secret_key') or row.get('WEEX_SECRET_KEY') or row.get('secretKey')
-            passphrase = row.get('passphrase') or row.get('WEEX_PASSPHRASE') or row.get('Passphrase')
-            
-            if not api_key and not secret_key and not passphrase:
-                continue
-            
-            if not api_key or not secret_key or not passphrase:
-                continue
-            
-            api_keys.append({
-                'api_key': api_key.strip(),
-                'secret_key': secret_key.strip(),
-                'passphrase': passphrase.strip()
-            })
-    return api_keys
+    if args.balance_only:
+        return {
+            'api_key': creds['api_key'],
+            'balance_check': checker.check_balance()
+        }
+    return checker.check_all(symbol=args.symbol, min_volume=args.min_volume)
 
 
-def load_api_keys(file_path: str) -> List[Dict[str, str]]:
-    """根据文件扩展名自动选择加载方式"""
-    if file_path.endswith('.json'):
-        return load_api_keys_from_json(file_path)
-    elif file_path.endswith('.csv'):
-        return load_api_keys_from_csv(file_path)
-    else:
-        raise ValueError(f"不支持的文件格式: {file_path}，请使用 .json 或 .csv")
+def dedupe_api_keys(api_keys: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], int]:
+    """去除凭证完全相同的重复项（保持原顺序），返回 (去重后的列表, 重复数量)"""
+    seen = set()
+    unique = []
+    for creds in api_keys:
+        identity = (creds.get('api_key'), creds.get('secret_key'), creds.get('passphrase'))
+        if identity in seen:
+            continue
+        seen.add(identity)
+        unique.append(creds)
+    return unique, len(api_keys) - len(unique)
 
 
 def format_balance_result(balance_check: Dict) -> str:
@@ -311,6 +353,9 @@ def main():
   
   # 仅检查余额
   python3 check_accounts.py --api-keys api_keys.csv --balance-only --proxy http://proxy.example.com:3128
+  
+  # 调整并发数和限速（每秒请求数）
+  python3 check_accounts.py --api-keys api_keys.csv --workers 32 --rate 20
 
 API Keys 文件格式与 official_api_test_batch.py 相同（JSON 或 CSV）
         """
@@ -355,12 +400,41 @@ API Keys 文件格式与 official_api_test_batch.py 相同（JSON 或 CSV）
         help='输出结果到 JSON 文件（可选）'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=16,
+        help='并发检查的账户数，默认: 16'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=10.0,
+        help='所有账户合计每秒最多发送的请求数（遇到限流时自动降速），默认: 10'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=REQUEST_TIMEOUT,
+        help=f'单个请求超时时间（秒），默认: {REQUEST_TIMEOUT}'
+    )
+    
     args = parser.parse_args()
+    # RateLimiter 要求速率为正数（同时排除 nan）
+    if not args.rate > 0:
+        parser.error(f"--rate 必须为正数: {args.rate:g}")
+    if args.workers < 1:
+        parser.error(f"--workers 至少为 1: {args.workers}")
     
     # 加载 API keys
     print(f"📁 从文件加载 API keys: {args.api_keys}")
-    api_keys_list = load_api_keys(args.api_keys)
-    print(f"✅ 加载了 {len(api_keys_list)} 个 API key\n")
+    api_keys_list, duplicate_count = dedupe_api_keys(load_api_keys(args.api_keys))
+    print(f"✅ 加载了 {len(api_keys_list)} 个 API key")
+    if duplicate_count:
+        print(f"⚠️  跳过 {duplicate_count} 个重复的 API key（凭证完全相同）")
+    print()
     
     # 显示配置信息
     if args.proxy:
@@ -370,38 +444,33 @@ API Keys 文件格式与 official_api_test_batch.py 相同（JSON 或 CSV）
         print(f"📊 最小交易量要求: {args.min_volume} USDT")
         print(f"📈 交易对: {args.symbol}\n")
     
-    # 批量检查
-    all_results = []
+    # 批量检查（I/O 密集，使用线程池并发，令牌桶统一限速）
+    total = len(api_keys_list)
+    all_results: List[Optional[Dict]] = [None] * total
+    rate_limiter = RateLimiter(args.rate)
+    workers = args.workers
     
-    for idx, creds in enumerate(api_keys_list, 1):
-        api_key_short = creds['api_key'][:15] + "..." if len(creds['api_key']) > 15 else creds['api_key']
-        print(f"[{idx}/{len(api_keys_list)}] 检查账户: {api_key_short}")
-        
-        checker = WEEXAccountChecker(
-            api_key=creds['api_key'],
-            secret_key=creds['secret_key'],
-            passphrase=creds['passphrase'],
-            proxy=args.proxy
-        )
-        
-        if args.balance_only:
-            balance_check = checker.check_balance()
-            result = {
-                'api_key': creds['api_key'],
-                'balance_check': balance_check
-            }
-            print(f"  {format_balance_result(balance_check)}")
-        else:
-            result = checker.check_all(symbol=args.symbol, min_volume=args.min_volume)
-            print(f"  {format_balance_result(result['balance_check'])}")
-            print(f"  {format_volume_result(result['volume_check'], args.min_volume)}")
-        
-        all_results.append(result)
-        print()
-        
-        # 避免请求过快
-        if idx < len(api_keys_list):
-            time.sleep(0.5)
+    with create_session(args.proxy, pool_size=workers) as session, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(check_account, creds, args, rate_limiter, session): idx
+            for idx, creds in enumerate(api_keys_list)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            creds = api_keys_list[idx]
+            result = future.result()
+            all_results[idx] = result
+            
+            # 结果只在主线程输出，每个账户拼成一段后一次写入，避免多次 print
+            api_key_short = creds['api_key'][:15] + "..." if len(creds['api_key']) > 15 else creds['api_key']
+            lines = [
+                f"[{idx + 1}/{total}] 检查账户: {api_key_short}",
+                f"  {format_balance_result(result['balance_check'])}",
+            ]
+            if not args.balance_only:
+                lines.append(f"  {format_volume_result(result['volume_check'], args.min_volume)}")
+            sys.stdout.write("\n".join(lines) + "\n\n")
     
     # 统计结果
     print("=" * 80)
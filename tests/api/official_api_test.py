@@ -8,14 +8,19 @@ WEEX AI Trading Hackathon - Official API Test Script
 要求: 完成至少 10 USDT 的交易
 """
 
+import argparse
 import time
-import hmac
-import hashlib
-import base64
 import requests
-import json
 import os
 import uuid
+import urllib.parse
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+
+from weex_sign import Signer, json_dumps, json_dumps_pretty, json_loads, timestamp_ms
+from weex_utils import RateLimiter, extract_orders, get_order_id
 
 # Try to load .env file if python-dotenv is available
 try:
@@ -38,47 +43,92 @@ if not api_key or not secret_key or not access_passphrase:
         "  - WEEX_PASSPHRASE\n"
     )
 
+# 签名用的静态材料在模块加载时准备一次：Signer 预先吸收 HMAC 密钥分组，
+# 每次请求只需 copy() SHA-256 状态并做一次 base64
+SIGNER = Signer(secret_key)
+API_KEY = api_key
+PASSPHRASE = access_passphrase
+
 BASE_URL = "https://api-contract.weex.com"
 SYMBOL = "cmt_btcusdt"  # 官方测试交易对
+REQUEST_TIMEOUT = 30  # 单个请求超时（秒）
+# WEEX_VERBOSE=1 时打印每个成功响应的完整内容（失败响应总是打印）
+VERBOSE = os.environ.get("WEEX_VERBOSE") == "1"
 
+# 成交后的只读查询（历史委托、交易详情）互不依赖，可以并发发出
+ORDER_HISTORY_REQUEST = ("GET", "/capi/v2/order/history", {"symbol": SYMBOL, "pageSize": 10})
+TRADE_FILLS_REQUEST = ("GET", "/capi/v2/order/fills", {"symbol": SYMBOL, "pageSize": 10})
 
-def generate_signature(secret_key, timestamp, method, request_path, query_string, body=""):
-    """生成 API 签名"""
-    message = timestamp + method.upper() + request_path + query_string + str(body)
-    signature = hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).digest()
-    return base64.b64encode(signature).decode()
+# 逐个撤单时的限速（每秒请求数），令牌桶只在桶空时才等待
+CANCEL_RATE = 5
 
+# 行情价格缓存: symbol -> (价格, 过期时间)，TTL 内重复取价不再发签名请求
+PRICE_CACHE_TTL = 5  # 秒
+_PRICE_CACHE = {}
 
-def send_request(method, request_path, query_string="", body=None):
-    """发送 API 请求"""
-    timestamp = str(int(time.time() * 1000))
-    body_str = json.dumps(body) if body else ""
-    
-    signature = generate_signature(secret_key, timestamp, method, request_path, query_string, body_str)
-    
-    headers = {
-        "ACCESS-KEY": api_key,
-        "ACCESS-SIGN": signature,
-        "ACCESS-TIMESTAMP": timestamp,
-        "ACCESS-PASSPHRASE": access_passphrase,
+# 所有会话挂载同一个连接池适配器：keep-alive 连接省去每个请求的 TCP+TLS 握手
+ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+
+
+def create_session():
+    """创建挂载共享连接池适配器、带固定请求头的会话"""
+    session = requests.Session()
+    session.mount("https://", ADAPTER)
+    session.headers.update({
+        "ACCESS-KEY": API_KEY,
+        "ACCESS-PASSPHRASE": PASSPHRASE,
         "Content-Type": "application/json",
         "locale": "zh-CN"
-    }
+    })
+    return session
+
+
+# 整个测试流程复用同一个会话，不变的请求头（包括 ACCESS-KEY / ACCESS-PASSPHRASE）放在会话上，
+# 每次请求只传签名和时间戳；并发请求时其余线程各用一个新会话（Session 不跨线程共享）
+SESSION = create_session()
+
+
+@dataclass(frozen=True)
+class TestConfig:
+    """测试流程参数（不同交易规模的测试只需换一份配置）"""
+    leverage: int = 20  # 杠杆倍数（全仓模式）
+    order_size: float = 0.005  # 每笔订单数量（BTC）
+    limit_price_ratio: float = 0.95  # 限价单价格 = 当前价格 * 该比例
+
+
+DEFAULT_CONFIG = TestConfig()
+
+
+def send_request(method, request_path, params=None, body=None, session=None):
+    """发送 API 请求（仅支持 GET / POST），session 默认为 SESSION"""
+    if method not in ("GET", "POST"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    # 签名和 URL 使用同一个 query_string，保证两者一致
+    query_string = "?" + urllib.parse.urlencode(params) if params else ""
+    timestamp = timestamp_ms()
+    # 签名和发送使用同一份 JSON 字节串，避免重复编码
+    body_bytes = json_dumps(body) if body else b""
     
-    url = BASE_URL + request_path
-    if query_string:
-        # 如果 query_string 已经包含 ?，直接拼接；否则添加 ?
-        if query_string.startswith("?"):
-            url += query_string
-        else:
-            url += "?" + query_string
+    signature = SIGNER.sign(timestamp, method, request_path, query_string, body_bytes)
     
-    if method == "GET":
-        response = requests.get(url, headers=headers)
-    elif method == "POST":
-        response = requests.post(url, headers=headers, data=body_str)
+    headers = {"ACCESS-SIGN": signature, "ACCESS-TIMESTAMP": timestamp}
     
-    return response
+    url = BASE_URL + request_path + query_string
+    
+    # GET 的 body_bytes 为空，两种方法走同一条 session.request 路径
+    return (session or SESSION).request(method, url, headers=headers, data=body_bytes or None, timeout=REQUEST_TIMEOUT)
+
+
+def send_requests_concurrently(*requests_args):
+    """并发发送多个互不依赖的只读请求，按传入顺序返回响应
+    
+    第一个请求使用 SESSION，其余请求各用一个新会话（共享同一个连接池适配器）
+    """
+    sessions = [SESSION] + [create_session() for _ in requests_args[1:]]
+    with ThreadPoolExecutor(max_workers=len(requests_args)) as executor:
+        futures = [executor.submit(send_request, *args, session=session)
+                   for args, session in zip(requests_args, sessions)]
+        return [future.result() for future in futures]
 
 
 def print_response(step_name, response):
@@ -86,14 +136,14 @@ def print_response(step_name, response):
     print(f"\n{'='*60}")
     print(f"步骤: {step_name}")
     print(f"状态码: {response.status_code}")
-    print(f"响应内容:")
     try:
-        data = response.json()
-        print(json.dumps(data, indent=2, ensure_ascii=False))
-        return data
-    except:
-        print(response.text)
-        return None
+        data = json_loads(response.content)
+    except ValueError:
+        data = None
+    if VERBOSE or response.status_code != 200:
+        print(f"响应内容:")
+        print(json_dumps_pretty(data) if data is not None else response.text)
+    return data
 
 
 def step1_check_domain():
@@ -142,14 +192,122 @@ def step2_check_account_balance():
         return None
 
 
+def wait_for_order_state(order_id, target_state, timeout=5, interval=0.25):
+    """轮询订单状态，代替固定时长的 sleep
+    
+    Args:
+        order_id: 订单ID
+        target_state: "open"=出现在当前委托中, "filled"=出现在历史委托中
+        timeout: 最长等待时间（秒），超时后继续执行后续步骤
+        interval: 轮询间隔（秒）
+    
+    Returns:
+        是否在超时前观察到目标状态
+    """
+    if target_state == "open":
+        request_args = ("GET", "/capi/v2/order/current", {"symbol": SYMBOL})
+    elif target_state == "filled":
+        request_args = ORDER_HISTORY_REQUEST
+    else:
+        raise ValueError(f"Unsupported order state: {target_state}")
+    
+    print(f"\n等待订单 {order_id} 状态: {target_state}（最多 {timeout} 秒）...")
+    order_id = str(order_id)
+    deadline = time.monotonic() + timeout
+    while True:
+        response = send_request(*request_args)
+        if response.status_code == 200:
+            try:
+                orders = extract_orders(json_loads(response.content))
+            except ValueError:
+                orders = []
+            if any(str(get_order_id(order)) == order_id for order in orders):
+                print(f"✅ 订单 {order_id} 已达到状态: {target_state}")
+                return True
+        if time.monotonic() + interval > deadline:
+            print(f"⚠️  等待订单 {order_id} 状态超时，继续执行...")
+            return False
+        time.sleep(interval)
+
+
+def wait_for_orders_cancelled(order_ids, timeout=5, interval=0.25):
+    """轮询当前委托，直到 order_ids 中的订单都已消失（代替撤单后固定等待）"""
+    print(f"\n等待订单取消完成（最多 {timeout} 秒）...")
+    pending = {str(order_id) for order_id in order_ids}
+    deadline = time.monotonic() + timeout
+    while True:
+        response = send_request("GET", "/capi/v2/order/current", params={"symbol": SYMBOL})
+        if response.status_code == 200:
+            try:
+                orders = extract_orders(json_loads(response.content))
+            except ValueError:
+                orders = []
+            if not any(str(get_order_id(order)) in pending for order in orders):
+                print(f"✅ 订单已全部取消")
+                return True
+        if time.monotonic() + interval > deadline:
+            print(f"⚠️  等待订单取消超时，继续执行...")
+            return False
+        time.sleep(interval)
+
+
+def cancel_orders_batch(order_ids):
+    """批量撤单（一个签名请求撤销全部订单），接口不可用时返回 None"""
+    print(f"  批量取消订单: {', '.join(order_ids)}")
+    response = send_request("POST", "/capi/v2/order/cancel_batch_orders", body={"ids": order_ids})
+    if response.status_code != 200:
+        print(f"    ⚠️  批量撤单不可用（状态码: {response.status_code}），改为逐个取消")
+        return None
+    try:
+        data = json_loads(response.content)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or not data.get('result'):
+        print(f"    ⚠️  批量撤单未成功，改为逐个取消: {response.text}")
+        return None
+    
+    fail_infos = data.get('failInfos') or data.get('fail_infos') or []
+    for info in fail_infos:
+        print(f"    ⚠️  订单取消失败: {info}")
+    return len(order_ids) - len(fail_infos)
+
+
+def cancel_orders_one_by_one(order_ids):
+    """逐个撤单（按 CANCEL_RATE 限速），返回成功取消的数量"""
+    rate_limiter = RateLimiter(CANCEL_RATE)
+    cancelled_count = 0
+    for order_id in order_ids:
+        print(f"  取消订单: {order_id}")
+        rate_limiter.acquire()
+        
+        # 取消订单
+        cancel_path = "/capi/v2/order/cancel_order"
+        cancel_body = {
+            "orderId": order_id
+        }
+        cancel_response = send_request("POST", cancel_path, body=cancel_body)
+        rate_limiter.observe(cancel_response)
+        
+        if cancel_response.status_code == 200:
+            print(f"    ✅ 订单 {order_id} 取消成功")
+            cancelled_count += 1
+        else:
+            print(f"    ⚠️  订单 {order_id} 取消失败: {cancel_response.status_code}")
+            try:
+                error_data = json_loads(cancel_response.content)
+                print(f"    错误信息: {json_dumps_pretty(error_data)}")
+            except ValueError:
+                print(f"    错误信息: {cancel_response.text}")
+    return cancelled_count
+
+
 def step2_5_cancel_all_active_orders():
     """步骤 2.5: 取消所有活跃订单（开单时无法调整杠杆）"""
     print("\n[步骤 2.5] 检查并取消所有活跃订单")
     
     # 获取当前委托（使用与 step9 相同的方式）
     request_path = "/capi/v2/order/current"
-    query_string = f"?symbol={SYMBOL}"  # 与 step9 保持一致，包含 ?
-    response = send_request("GET", request_path, query_string=query_string)
+    response = send_request("GET", request_path, params={"symbol": SYMBOL})
     data = print_response("获取当前委托", response)
     
     # 如果 HTTP 状态码不是 200，才是真正的失败
@@ -162,14 +320,7 @@ def step2_5_cancel_all_active_orders():
         print(f"✅ 没有活跃订单，无需取消")
         return 0
     
-    # 解析订单列表
-    orders = []
-    if isinstance(data, list):
-        orders = data if len(data) > 0 else []
-    elif isinstance(data, dict) and 'data' in data:
-        orders = data['data'] if isinstance(data['data'], list) and len(data['data']) > 0 else []
-    elif isinstance(data, dict) and 'list' in data:
-        orders = data['list'] if isinstance(data['list'], list) and len(data['list']) > 0 else []
+    orders = extract_orders(data)
     
     if not orders:
         print(f"✅ 没有活跃订单，无需取消")
@@ -177,81 +328,67 @@ def step2_5_cancel_all_active_orders():
     
     print(f"\n发现 {len(orders)} 个活跃订单，开始取消...")
     
-    cancelled_count = 0
+    order_ids = []
     for order in orders:
-        order_id = None
-        # 尝试不同的订单ID字段名
-        if 'orderId' in order:
-            order_id = order['orderId']
-        elif 'order_id' in order:
-            order_id = order['order_id']
-        elif 'id' in order:
-            order_id = order['id']
-        
+        order_id = get_order_id(order)
         if not order_id:
             print(f"⚠️  订单缺少ID字段，跳过: {order}")
             continue
-        
-        print(f"  取消订单: {order_id}")
-        
-        # 取消订单
-        cancel_path = "/capi/v2/order/cancel_order"
-        cancel_body = {
-            "orderId": str(order_id)
-        }
-        cancel_response = send_request("POST", cancel_path, body=cancel_body)
-        
-        if cancel_response.status_code == 200:
-            print(f"    ✅ 订单 {order_id} 取消成功")
-            cancelled_count += 1
-        else:
-            print(f"    ⚠️  订单 {order_id} 取消失败: {cancel_response.status_code}")
-            try:
-                error_data = cancel_response.json()
-                print(f"    错误信息: {json.dumps(error_data, ensure_ascii=False)}")
-            except:
-                print(f"    错误信息: {cancel_response.text}")
-        
-        # 稍微延迟，避免请求过快
-        time.sleep(0.2)
+        order_ids.append(str(order_id))
+    
+    # 优先一次批量撤单；接口不可用时退回逐个撤单
+    cancelled_count = cancel_orders_batch(order_ids) if order_ids else 0
+    if cancelled_count is None:
+        cancelled_count = cancel_orders_one_by_one(order_ids)
     
     print(f"\n✅ 成功取消 {cancelled_count}/{len(orders)} 个订单")
     
     if cancelled_count > 0:
-        print(f"\n等待 2 秒确保订单取消完成...")
-        time.sleep(2)
+        wait_for_orders_cancelled(order_ids)
     
     return cancelled_count
 
 
-def step3_set_leverage():
-    """步骤 3: 设置杠杆为 20x（全仓模式）"""
+def step3_set_leverage(config=DEFAULT_CONFIG):
+    """步骤 3: 设置杠杆（全仓模式，倍数取自 config.leverage）"""
     print("\n[步骤 3] 设置杠杆")
+    leverage = str(config.leverage)
     request_path = "/capi/v2/account/leverage"
     body = {
         "symbol": SYMBOL,
         "marginMode": 1,  # 1 = 全仓模式
-        "longLeverage": "20",
-        "shortLeverage": "20"
+        "longLeverage": leverage,
+        "shortLeverage": leverage
     }
     response = send_request("POST", request_path, body=body)
-    data = print_response("设置杠杆 (20x, 全仓模式)", response)
+    data = print_response(f"设置杠杆 ({leverage}x, 全仓模式)", response)
     
     if response.status_code == 200:
-        print(f"✅ 杠杆设置成功: 20x (全仓)")
+        print(f"✅ 杠杆设置成功: {leverage}x (全仓)")
         return True
     else:
         print(f"⚠️  杠杆设置可能失败，继续执行...")
         return False
 
 
-def step4_get_asset_price():
-    """步骤 4: 获取资产价格"""
+def step4_get_asset_price(symbol=SYMBOL):
+    """步骤 4: 获取资产价格（PRICE_CACHE_TTL 秒内复用已取到的价格）"""
     print("\n[步骤 4] 获取资产价格")
+    cached = _PRICE_CACHE.get(symbol)
+    if cached and cached[1] > time.monotonic():
+        print(f"\n✅ 当前价格: {cached[0]} USDT (缓存)")
+        return cached[0]
+    
     request_path = "/capi/v2/market/ticker"
-    query_string = f"?symbol={SYMBOL}"
-    response = send_request("GET", request_path, query_string=query_string)
-    data = print_response("获取资产价格", response)
+    response = send_request("GET", request_path, params={"symbol": symbol})
+    if response.status_code == 200 and not VERBOSE:
+        # 取价只需要 last 字段，直接解析，不经过 print_response 的格式化输出
+        try:
+            data = json_loads(response.content)
+        except ValueError:
+            data = None
+    else:
+        data = print_response("获取资产价格", response)
     
     if response.status_code == 200 and data:
         # data 直接就是对象，没有 data 层级
@@ -259,7 +396,9 @@ def step4_get_asset_price():
             last_price = data.get('last') or data.get('lastPrice')
             if last_price:
                 print(f"\n✅ 当前价格: {last_price} USDT")
-                return float(last_price)
+                price = float(last_price)
+                _PRICE_CACHE[symbol] = (price, time.monotonic() + PRICE_CACHE_TTL)
+                return price
     return None
 
 
@@ -275,7 +414,7 @@ def place_order(price, size, order_type, side="1", order_type_flag="0", match_pr
         order_type_flag: "0"=普通, "1"=只做maker, "2"=全部成交或立即取消, "3"=立即成交并取消剩余
         match_price: "0"=限价, "1"=市价
     """
-    client_oid = str(int(time.time() * 1000))
+    client_oid = timestamp_ms()
     
     request_path = "/capi/v2/order/placeOrder"
     body = {
@@ -288,7 +427,7 @@ def place_order(price, size, order_type, side="1", order_type_flag="0", match_pr
         "price": str(int(price))
     }
     
-    print(f"下单参数: {json.dumps(body, indent=2, ensure_ascii=False)}")
+    print(f"下单参数: {json_dumps_pretty(body)}")
     
     response = send_request("POST", request_path, body=body)
     data = print_response(f"下单 ({order_type})", response)
@@ -310,16 +449,16 @@ def place_order(price, size, order_type, side="1", order_type_flag="0", match_pr
         return None
 
 
-def step5_place_limit_buy_order(price):
-    """步骤 5: 下限价买单（市价5%以下，确保能查询到当前委托）"""
-    print("\n[步骤 5] 下限价买单（市价5%以下）")
+def step5_place_limit_buy_order(price, config=DEFAULT_CONFIG):
+    """步骤 5: 下限价买单（低于市价，确保能查询到当前委托）"""
+    print("\n[步骤 5] 下限价买单（低于市价）")
     
-    # 计算限价：当前价格的95%（比市价低5%）
-    limit_price = price * 0.95
-    order_size = 0.005  # 0.005 BTC
+    # 计算限价：当前价格 * limit_price_ratio（默认 95%，比市价低 5%）
+    limit_price = price * config.limit_price_ratio
+    order_size = config.order_size
     
     print(f"当前价格: {price} USDT")
-    print(f"限价: {limit_price} USDT (95% of current price)")
+    print(f"限价: {limit_price} USDT ({config.limit_price_ratio:.0%} of current price)")
     print(f"订单数量: {order_size} BTC")
     
     order_id = place_order(
@@ -334,11 +473,11 @@ def step5_place_limit_buy_order(price):
     return order_id
 
 
-def step6_place_market_buy_order(price):
+def step6_place_market_buy_order(price, config=DEFAULT_CONFIG):
     """步骤 6: 下市价买单（确保成交后能查到交易历史）"""
     print("\n[步骤 6] 下市价买单")
     
-    order_size = 0.005  # 0.005 BTC
+    order_size = config.order_size
     print(f"当前价格: {price} USDT")
     print(f"订单数量: {order_size} BTC")
     
@@ -354,11 +493,11 @@ def step6_place_market_buy_order(price):
     return order_id
 
 
-def step7_place_market_sell_order(price):
+def step7_place_market_sell_order(price, config=DEFAULT_CONFIG):
     """步骤 7: 下市价卖单（平仓）"""
     print("\n[步骤 7] 下市价卖单（平仓）")
     
-    order_size = 0.005  # 0.005 BTC
+    order_size = config.order_size
     print(f"当前价格: {price} USDT")
     print(f"订单数量: {order_size} BTC")
     
@@ -398,8 +537,7 @@ def step9_get_current_orders():
     """步骤 9: 获取当前委托"""
     print("\n[步骤 9] 获取当前委托")
     request_path = "/capi/v2/order/current"
-    query_string = f"?symbol={SYMBOL}"
-    response = send_request("GET", request_path, query_string=query_string)
+    response = send_request("GET", request_path, params={"symbol": SYMBOL})
     data = print_response("获取当前委托", response)
     
     if response.status_code == 200:
@@ -410,12 +548,11 @@ def step9_get_current_orders():
         return None
 
 
-def step10_get_order_history():
-    """步骤 10: 获取历史委托"""
+def step10_get_order_history(response=None):
+    """步骤 10: 获取历史委托（response 为已预取的响应时直接使用）"""
     print("\n[步骤 10] 获取历史委托")
-    request_path = "/capi/v2/order/history"
-    query_string = f"?symbol={SYMBOL}&pageSize=10"
-    response = send_request("GET", request_path, query_string=query_string)
+    if response is None:
+        response = send_request(*ORDER_HISTORY_REQUEST)
     data = print_response("获取历史委托", response)
     
     if response.status_code == 200:
@@ -426,12 +563,11 @@ def step10_get_order_history():
         return None
 
 
-def step11_get_trade_details():
-    """步骤 11: 获取交易详情"""
+def step11_get_trade_details(response=None):
+    """步骤 11: 获取交易详情（response 为已预取的响应时直接使用）"""
     print("\n[步骤 11] 获取交易详情")
-    request_path = "/capi/v2/order/fills"
-    query_string = f"?symbol={SYMBOL}&pageSize=10"
-    response = send_request("GET", request_path, query_string=query_string)
+    if response is None:
+        response = send_request(*TRADE_FILLS_REQUEST)
     data = print_response("获取交易详情", response)
     
     if response.status_code == 200:
@@ -442,7 +578,7 @@ def step11_get_trade_details():
         return None
 
 
-def main():
+def run_test(config=DEFAULT_CONFIG):
     """主测试流程"""
     print("="*60)
     print("WEEX AI Trading Hackathon - API 测试")
@@ -465,7 +601,7 @@ def main():
     results['cancelled_before'] = cancelled_count_before
     
     # 步骤 3: 设置杠杆
-    leverage_success = step3_set_leverage()
+    leverage_success = step3_set_leverage(config)
     results['leverage'] = leverage_success
     
     # 步骤 4: 获取价格
@@ -476,47 +612,49 @@ def main():
     
     if price:
         # 步骤 5: 下限价买单（市价5%以下，确保能查询到当前委托）
-        limit_order_id = step5_place_limit_buy_order(price)
+        limit_order_id = step5_place_limit_buy_order(price, config)
         results['limit_order_id'] = limit_order_id
         
         if limit_order_id:
-            print(f"\n等待 2 秒...")
-            time.sleep(2)
+            # 等待限价单出现在当前委托中
+            if limit_order_id != "unknown":
+                wait_for_order_state(limit_order_id, "open")
             
             # 步骤 6: 查询当前委托（确认限价单存在）
             current_orders = step9_get_current_orders()
             results['current_orders'] = current_orders
             
-            print(f"\n等待 2 秒...")
-            time.sleep(2)
-            
             # 步骤 7: 下市价买单（确保成交）
-            market_buy_order_id = step6_place_market_buy_order(price)
+            market_buy_order_id = step6_place_market_buy_order(price, config)
             results['market_buy_order_id'] = market_buy_order_id
             
             if market_buy_order_id:
-                print(f"\n等待 3 秒让市价买单成交...")
-                time.sleep(3)
+                # 等待市价买单成交（出现在历史委托中）
+                if market_buy_order_id != "unknown":
+                    wait_for_order_state(market_buy_order_id, "filled")
                 
                 # 步骤 8: 下市价卖单（平仓，恢复账户状态）
-                market_sell_order_id = step7_place_market_sell_order(price)
+                market_sell_order_id = step7_place_market_sell_order(price, config)
                 results['market_sell_order_id'] = market_sell_order_id
                 
                 if market_sell_order_id:
-                    print(f"\n等待 3 秒让市价卖单成交...")
-                    time.sleep(3)
+                    # 等待市价卖单成交（出现在历史委托中）
+                    if market_sell_order_id != "unknown":
+                        wait_for_order_state(market_sell_order_id, "filled")
+                    
+                    # 历史委托和交易详情互不依赖，并发查询后按顺序打印
+                    history_response, fills_response = send_requests_concurrently(
+                        ORDER_HISTORY_REQUEST, TRADE_FILLS_REQUEST
+                    )
                     
                     # 步骤 9: 查询历史委托（确认市价单已成交）
-                    history = step10_get_order_history()
+                    history = step10_get_order_history(history_response)
                     results['history'] = history
                     
                     # 步骤 10: 查询交易详情
-                    trade_details = step11_get_trade_details()
+                    trade_details = step11_get_trade_details(fills_response)
                     results['trade_details'] = trade_details
                     
-                    print(f"\n等待 1 秒...")
-                    time.sleep(1)
-                    
                     # 步骤 11: 取消限价单（清理未成交的限价单）
                     if limit_order_id and limit_order_id != "unknown":
                         cancel_success = step8_cancel_order(limit_order_id)
@@ -552,8 +690,8 @@ def main():
     print("\n✅ 测试流程已完成:")
     print("  1. 检查账户余额")
     print("  2. 取消所有活跃订单（开单时无法调整杠杆）")
-    print("  3. 设置杠杆（20x）")
-    print("  4. 下限价买单（95%价格，不会立即成交）")
+    print(f"  3. 设置杠杆（{config.leverage}x）")
+    print(f"  4. 下限价买单（{config.limit_price_ratio:.0%}价格，不会立即成交）")
     print("  5. 查询当前委托（确认限价单存在）")
     print("  6. 下市价买单（立即成交）")
     print("  7. 下市价卖单（立即成交，恢复账户状态）")
@@ -563,6 +701,23 @@ def main():
     print("\n账户应该已经恢复到接近初始状态，且没有挂单。")
 
 
+def main():
+    parser = argparse.ArgumentParser(description='WEEX 官方 API 测试流程')
+    parser.add_argument('--leverage', type=int, default=DEFAULT_CONFIG.leverage,
+                        help=f'杠杆倍数，全仓模式 (默认: {DEFAULT_CONFIG.leverage})')
+    parser.add_argument('--order-size', type=float, default=DEFAULT_CONFIG.order_size,
+                        help=f'每笔订单数量 BTC (默认: {DEFAULT_CONFIG.order_size})')
+    parser.add_argument('--limit-price-ratio', type=float, default=DEFAULT_CONFIG.limit_price_ratio,
+                        help=f'限价单价格相对当前价格的比例 (默认: {DEFAULT_CONFIG.limit_price_ratio})')
+    args = parser.parse_args()
+    
+    run_test(TestConfig(
+        leverage=args.leverage,
+        order_size=args.order_size,
+        limit_price_ratio=args.limit_price_ratio
+    ))
+
+
 if __name__ == '__main__':
     main()
 
@@ -0,0 +1,94 @@
+"""
+WEEX API 签名工具
+check_accounts.py、api_testing.py 等脚本共用的签名与请求头实现
+
+签名规则:
+    message = timestamp + METHOD + request_path + query_string + body
+    ACCESS-SIGN = base64(HMAC-SHA256(secret_key, message))
+"""
+
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from typing import Dict
+
+# 如果安装了 orjson，使用它做 JSON 编解码（C/Rust 实现，dumps 直接返回 bytes，可直接参与签名）
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+
+    def json_dumps_pretty(obj) -> str:
+        """缩进 2 格的可读 JSON（非 ASCII 字符原样输出），用于打印"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    json_loads = json.loads
+
+    def json_dumps_pretty(obj) -> str:
+        """缩进 2 格的可读 JSON（非 ASCII 字符原样输出），用于打印"""
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+# HMAC-SHA256 的 ipad/opad 异或表（SHA-256 分组长度为 64 字节）
+_HMAC_BLOCK_SIZE = 64
+_TRANS_36 = bytes(x ^ 0x36 for x in range(256))
+_TRANS_5C = bytes(x ^ 0x5C for x in range(256))
+
+_METHOD_BYTES = {"GET": b"GET", "POST": b"POST"}
+
+
+def timestamp_ms() -> str:
+    """当前毫秒时间戳（整数运算，不经过浮点数）"""
+    return str(time.time_ns() // 1_000_000)
+
+
+def build_message(timestamp: str, method: str, request_path: str, query_string: str = "", body: bytes = b"") -> bytes:
+    """拼接签名串（method 须为大写，body 为已编码的 JSON 字节串，GET 请求为空）"""
+    method_bytes = _METHOD_BYTES.get(method) or method.encode()
+    if body:
+        return b"".join((timestamp.encode(), method_bytes, request_path.encode(), query_string.encode(), body))
+    return b"".join((timestamp.encode(), method_bytes, request_path.encode(), query_string.encode()))
+
+
+def sign(secret_bytes: bytes, timestamp: str, method: str, request_path: str, query_string: str = "", body: bytes = b"") -> str:
+    """一次性签名（hmac.digest 直接走 OpenSSL），适合只签名一次的场景"""
+    message = build_message(timestamp, method, request_path, query_string, body)
+    signature = hmac.digest(secret_bytes, message, 'sha256')
+    return binascii.b2a_base64(signature, newline=False).decode('ascii')
+
+
+class Signer:
+    """绑定单个 secret_key 的签名器
+
+    构造时预先吸收 HMAC 的 ipad/opad 分组，之后每次签名只需 copy()
+    已初始化的 SHA-256 状态，比每次重新计算密钥分组少一次压缩运算。
+    """
+
+    def __init__(self, secret_key: str):
+        key = secret_key.encode()
+        if len(key) > _HMAC_BLOCK_SIZE:
+            key = hashlib.sha256(key).digest()
+        key = key.ljust(_HMAC_BLOCK_SIZE, b'\0')
+        self._inner = hashlib.sha256(key.translate(_TRANS_36))
+        self._outer = hashlib.sha256(key.translate(_TRANS_5C))
+
+    def sign(self, timestamp: str, method: str, request_path: str, query_string: str = "", body: bytes = b"") -> str:
+        """生成 ACCESS-SIGN"""
+        inner = self._inner.copy()
+        inner.update(build_message(timestamp, method, request_path, query_string, body))
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return binascii.b2a_base64(outer.digest(), newline=False).decode('ascii')
+
+
+def build_headers(api_key: str, passphrase: str, signature: str, timestamp: str) -> Dict[str, str]:
+    """构造认证请求头（Content-Type、locale 等固定头由调用方或会话设置）"""
+    return {
+        "ACCESS-KEY": api_key,
+        "ACCESS-SIGN": signature,
+        "ACCESS-TIMESTAMP": timestamp,
+        "ACCESS-PASSPHRASE": passphrase
+    }
@@ -0,0 +1,240 @@
+"""
+WEEX API 测试脚本共用工具
+check_accounts.py、official_api_test.py、official_api_test_batch.py 等脚本共用的
+限速器、委托查询结果解析、多线程输出缓冲和 API key 文件加载
+"""
+
+import csv
+import io
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from weex_sign import json_loads
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """解析 Retry-After 响应头（秒数），缺失或无法解析时返回默认值"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """自适应令牌桶限速器（线程安全），多个检查线程共享同一个实例
+    
+    根据响应自动调整速率：
+    - HTTP 429: 按 Retry-After 暂停发放令牌，速率减半
+    - X-RateLimit-Remaining 低于桶容量: 速率减半
+    - 其余响应: 速率逐步恢复，最高不超过初始速率
+    
+    Args:
+        rate: 每秒补充的令牌数（即平均每秒允许的请求数），同时也是速率上限
+        capacity: 桶容量（允许的最大突发请求数），默认与 rate 相同
+        min_rate: 降速的下限，默认为 rate 的 1/10
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[int] = None, min_rate: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate 必须大于 0: {rate}")
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """获取一个令牌，桶为空或处于暂停期时等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    # 暂停期间不累积令牌
+                    self._last = now
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def observe(self, response: requests.Response) -> None:
+        """根据响应状态码和限流相关响应头调整速率"""
+        with self._lock:
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                self._tokens = 0.0
+                self.rate = max(self.min_rate, self.rate / 2)
+                return
+            
+            try:
+                remaining = int(response.headers['X-RateLimit-Remaining'])
+            except (KeyError, ValueError):
+                remaining = None
+            
+            if remaining is not None and remaining < self.capacity:
+                self.rate = max(self.min_rate, self.rate / 2)
+            elif self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+def extract_orders(data) -> List[Dict]:
+    """从委托查询结果中解析订单列表（兼容直接数组和 data / list 包装）"""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ('data', 'list'):
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def get_order_id(order: Dict) -> Optional[str]:
+    """尝试不同的订单ID字段名"""
+    for key in ('orderId', 'order_id', 'id'):
+        if order.get(key):
+            return order[key]
+    return None
+
+
+class _ThreadRoutedStdout:
+    """按线程分流的 stdout：正在缓冲的线程写入自己的缓冲区，其他线程照常输出"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        return self._stream.write(text)
+    
+    def flush(self) -> None:
+        if getattr(self._local, 'buffer', None) is None:
+            self._stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+def run_with_buffered_output(func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, str]:
+    """在当前线程中执行 func，并把它的 print 输出收集到缓冲区
+    
+    多个线程并发执行各自的测试流程时，输出不会互相穿插；
+    调用方拿到完整输出后再一次性写出。
+    
+    Returns:
+        (func 的返回值, 捕获的输出文本)
+    """
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadRoutedStdout):
+            sys.stdout = _ThreadRoutedStdout(sys.stdout)
+        router = sys.stdout
+    
+    buffer = io.StringIO()
+    router._local.buffer = buffer
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        router._local.buffer = None
+    return result, buffer.getvalue()
+
+
+def load_api_keys_from_json(file_path: str) -> List[Dict[str, str]]:
+    """从 JSON 文件加载 API keys"""
+    with open(file_path, 'rb') as f:
+        data = json_loads(f.read())
+    
+    if isinstance(data, list):
+        return data
+    elif isinstance(data, dict) and 'api_keys' in data:
+        return data['api_keys']
+    else:
+        raise ValueError("JSON 文件格式错误，应该是数组或包含 'api_keys' 字段的对象")
+
+
+# CSV 中每个字段可接受的列名（按优先级排列）
+CSV_FIELD_ALIASES = {
+    'api_key': ('api_key', 'WEEX_API_KEY', 'apiKey'),
+    'secret_key': ('secret_key', 'WEEX_SECRET_KEY', 'secretKey'),
+    'passphrase': ('passphrase', 'WEEX_PASSPHRASE', 'Passphrase'),
+}
+
+
+def _first_value(row: List[str], indices: List[int]) -> Optional[str]:
+    """按列优先级返回第一个非空值"""
+    for i in indices:
+        if i < len(row) and row[i]:
+            return row[i]
+    return None
+
+
+def load_api_keys_from_csv(file_path: str, warn_incomplete: bool = False) -> List[Dict[str, str]]:
+    """从 CSV 文件加载 API keys
+    
+    只在读取表头时解析一次列位置，之后按下标取值，不为每一行构造 dict。
+    
+    Args:
+        file_path: CSV 文件路径
+        warn_incomplete: 是否对缺少字段而被跳过的行打印警告（空行总是静默跳过）
+    """
+    api_keys = []
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return api_keys
+        
+        columns = {
+            field: [header.index(name) for name in aliases if name in header]
+            for field, aliases in CSV_FIELD_ALIASES.items()
+        }
+        key_cols, secret_cols, passphrase_cols = columns['api_key'], columns['secret_key'], columns['passphrase']
+        
+        for row_num, row in enumerate(reader, start=2):  # 从第2行开始（第1行是标题）
+            api_key = _first_value(row, key_cols)
+            secret_key = _first_value(row, secret_cols)
+            passphrase = _first_value(row, passphrase_cols)
+            
+            # 跳过空行
+            if not api_key and not secret_key and not passphrase:
+                continue
+            
+            # 验证必需的字段
+            if not api_key or not secret_key or not passphrase:
+                if warn_incomplete:
+                    print(f"⚠️  警告: CSV 第 {row_num} 行缺少必需的字段，已跳过")
+                    print(f"    api_key: {'有' if api_key else '缺失'}, secret_key: {'有' if secret_key else '缺失'}, passphrase: {'有' if passphrase else '缺失'}")
+                continue
+            
+            api_keys.append({
+                'api_key': api_key.strip(),
+                'secret_key': secret_key.strip(),
+                'passphrase': passphrase.strip()
+            })
+    return api_keys
+
+
+def load_api_keys(file_path: str, warn_incomplete: bool = False) -> List[Dict[str, str]]:
+    """根据文件扩展名自动选择加载方式"""
+    if file_path.endswith('.json'):
+        return load_api_keys_from_json(file_path)
+    elif file_path.endswith('.csv'):
+        return load_api_keys_from_csv(file_path, warn_incomplete=warn_incomplete)
+    else:
+        raise ValueError(f"不支持的文件格式: {file_path}，请使用 .json 或 .csv")